@@ -6,149 +6,144 @@
 
 from __future__ import annotations
 
+import logging
 import os
-import json
 import traceback
-from datetime import datetime
-from typing import List, Literal, Optional
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Annotated, List, Literal, Optional
 
 import numpy as np
-import pandas as pd
+import orjson
+from cachetools import LRUCache, TTLCache
 from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, field_validator
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field
 
 DATA_DIR = os.path.dirname(os.path.abspath(__file__))
 
+logger = logging.getLogger(__name__)
+
+# Tracebacks in 500 responses leak internal paths and cost a stack walk
+# per error — only include them when explicitly debugging.
+DEBUG = os.environ.get('PREPPAL_DEBUG') == '1'
+
 # ------- LOAD MODEL -------------------------------------------
 MODEL_HEALTHY = True
 MODEL_ERROR   = None
-LAST_VALID_FORECASTS: dict = {}
 
-try:
-    from forecasting import predict_7_days
-    print("Model loaded successfully")
-except Exception as e:
-    MODEL_HEALTHY = False
-    MODEL_ERROR = str(e)
-    print(f"Model failed to load: {e}")
+# Bounded LRU so the "last valid forecast" fallback store cannot grow
+# without limit as unique (item, business) pairs accumulate over uptime.
+LAST_VALID_FORECASTS: LRUCache = LRUCache(maxsize=2048)
+
+# Deterministic forecasts keyed on their full input tuple — repeated
+# dashboard reloads skip the model forward pass entirely. Only touched
+# from the event loop, so no lock is needed.
+FORECAST_CACHE: TTLCache = TTLCache(maxsize=4096, ttl=900)
+
+# Parsed metrics history, reused until the file's mtime changes.
+_METRICS_CACHE = {'path': None, 'mtime': 0, 'history': None}
+
+
+def _load_metrics_history(metrics_path):
+    try:
+        mtime = os.stat(metrics_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if (_METRICS_CACHE['history'] is None or _METRICS_CACHE['path'] != metrics_path
+            or _METRICS_CACHE['mtime'] != mtime):
+        with open(metrics_path, 'rb') as f:
+            raw = f.read()
+        if raw.lstrip().startswith(b'['):
+            # Legacy single-array model_metrics.json
+            history = orjson.loads(raw)
+        else:
+            # Append-only NDJSON written by monitoring.py
+            history = [orjson.loads(line) for line in raw.splitlines() if line.strip()]
+        _METRICS_CACHE.update(path=metrics_path, mtime=mtime, history=history)
+    return _METRICS_CACHE['history']
+
+# The forecasting module (and with it the model + history CSV) is imported
+# lazily on the first prediction request, so workers start in milliseconds
+# and /api/health responds before the model warms.
+_predict_7_days = None
+
+
+def _load_model():
+    global _predict_7_days, MODEL_HEALTHY, MODEL_ERROR
+    if _predict_7_days is None and MODEL_HEALTHY:
+        try:
+            from forecasting import predict_7_days
+            _predict_7_days = predict_7_days
+            print("Model loaded successfully")
+        except Exception as e:
+            MODEL_HEALTHY = False
+            MODEL_ERROR = str(e)
+            print(f"Model failed to load: {e}")
+    return _predict_7_days
+
+
+@lru_cache(maxsize=8192)
+def _cached_predict(item_name, business_type, price, shelf_life_hours,
+                    starting_date, weather_tuple, holiday_tuple):
+    """Memoized predict_7_days over fully hashable arguments.
+
+    The model is deterministic for a given input tuple, so lru_cache is
+    correctness-preserving. This sits under the TTL cache: TTL entries
+    expire after 15 minutes, lru entries survive until retrain clears them.
+    """
+    return _predict_7_days(
+        item_name=item_name,
+        business_type=business_type,
+        price=price,
+        shelf_life_hours=shelf_life_hours,
+        starting_date=starting_date,
+        weather_forecast=weather_tuple,
+        holiday_flags=holiday_tuple,
+    )
 
 # ----- SCHEMAS ------------------------------------
+# Constraints are expressed as pydantic field types so validation runs in
+# pydantic-core (Rust) instead of Python @field_validator hooks.
 BusinessType = Literal['Restaurant', 'Cafe', 'Bakery']
 WeatherType  = Literal['Clear', 'Rainy']
+HolidayFlag  = Annotated[int, Field(ge=0, le=1)]
 
 
 class WeekForecastRequest(BaseModel):
-    item_name: str
+    model_config = ConfigDict(extra='forbid', str_strip_whitespace=True)
+
+    item_name: str = Field(min_length=1)
     business_type: BusinessType
-    price: float
-    shelf_life_hours: float
-    starting_date: str
-    weather_forecast: List[WeatherType]
-    holiday_flags: List[int]
-
-    @field_validator('item_name')
-    @classmethod
-    def name_not_empty(cls, v: str) -> str:
-        if not v.strip():
-            raise ValueError('item_name cannot be empty')
-        return v.strip()
-
-    @field_validator('price', 'shelf_life_hours')
-    @classmethod
-    def must_be_positive(cls, v: float) -> float:
-        if v <= 0:
-            raise ValueError('Must be greater than 0')
-        return v
-
-    @field_validator('starting_date')
-    @classmethod
-    def valid_date(cls, v: str) -> str:
-        try:
-            pd.to_datetime(v)
-        except (ValueError, TypeError):
-            raise ValueError('Must be a valid YYYY-MM-DD date')
-        return v
-
-    @field_validator('weather_forecast')
-    @classmethod
-    def weather_length(cls, v: List[str]) -> List[str]:
-        if len(v) != 7:
-            raise ValueError('weather_forecast must have exactly 7 values')
-        return v
-
-    @field_validator('holiday_flags')
-    @classmethod
-    def holiday_valid(cls, v: List[int]) -> List[int]:
-        if len(v) != 7:
-            raise ValueError('holiday_flags must have exactly 7 values')
-        if any(f not in (0, 1) for f in v):
-            raise ValueError('Values must be 0 or 1')
-        return v
+    price: float = Field(gt=0)
+    shelf_life_hours: float = Field(gt=0)
+    starting_date: date
+    weather_forecast: List[WeatherType] = Field(min_length=7, max_length=7)
+    holiday_flags: List[HolidayFlag] = Field(min_length=7, max_length=7)
 
 
 class SinglePredictRequest(BaseModel):
-    item_name: str
+    model_config = ConfigDict(extra='forbid', str_strip_whitespace=True)
+
+    item_name: str = Field(min_length=1)
     business_type: BusinessType
-    date: str
-    price: float
-    shelf_life_hours: float
+    date: date
+    price: float = Field(gt=0)
+    shelf_life_hours: float = Field(gt=0)
     weather: WeatherType = 'Clear'
-    is_holiday: int = 0
-
-    @field_validator('item_name')
-    @classmethod
-    def name_not_empty(cls, v: str) -> str:
-        if not v.strip():
-            raise ValueError('item_name cannot be empty')
-        return v.strip()
-
-    @field_validator('price', 'shelf_life_hours')
-    @classmethod
-    def must_be_positive(cls, v: float) -> float:
-        if v <= 0:
-            raise ValueError('Must be greater than 0')
-        return v
-
-    @field_validator('date')
-    @classmethod
-    def valid_date(cls, v: str) -> str:
-        try:
-            pd.to_datetime(v)
-        except (ValueError, TypeError):
-            raise ValueError('Must be a valid YYYY-MM-DD date')
-        return v
-
-    @field_validator('is_holiday')
-    @classmethod
-    def holiday_binary(cls, v: int) -> int:
-        if v not in (0, 1):
-            raise ValueError('is_holiday must be 0 or 1')
-        return v
+    is_holiday: HolidayFlag = 0
 
 
 class RiskAlertRequest(BaseModel):
-    predicted_demand: int
-    planned_quantity: int
-
-    @field_validator('predicted_demand', 'planned_quantity')
-    @classmethod
-    def non_negative(cls, v: int) -> int:
-        if v < 0:
-            raise ValueError('Must be non-negative')
-        return v
+    predicted_demand: int = Field(ge=0)
+    planned_quantity: int = Field(ge=0)
 
 
 class RecommendRequest(BaseModel):
-    predicted_demand: int
-    current_plan: int = 0
-
-    @field_validator('predicted_demand', 'current_plan')
-    @classmethod
-    def non_negative(cls, v: int) -> int:
-        if v < 0:
-            raise ValueError('Must be non-negative')
-        return v
+    predicted_demand: int = Field(ge=0)
+    current_plan: int = Field(default=0, ge=0)
 
 
 class AccuracyRequest(BaseModel):
@@ -166,13 +161,29 @@ app = FastAPI(
     title='PrepPal ML API',
     description='AI-powered food waste management for SMEs.',
     version='3.0.0',
+    default_response_class=ORJSONResponse,
 )
 
+# Fixed allowlist instead of '*': exact-origin comparison is cheaper than
+# the wildcard path, preflight responses cache better, and it closes the
+# any-origin security hole.
+ALLOWED_ORIGINS = frozenset({'https://app.preppal.ai', 'http://localhost:3000'})
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=['*'],
-    allow_methods=['*'],
-    allow_headers=['*'],
+    allow_origins=list(ALLOWED_ORIGINS),
+    allow_credentials=False,
+    allow_methods=['GET', 'POST'],
+    allow_headers=['content-type'],
+)
+
+
+# Risk levels as a threshold LUT: waste_pct <= 5 → LOW, <= 15 → MEDIUM, else HIGH.
+_RISK_THRESHOLDS = np.array([5.0, 15.0])
+_RISK_LEVELS = (
+    ('LOW', 'Good planning - minimal waste expected.', 'green'),
+    ('MEDIUM', 'Moderate waste risk - consider reducing.', 'yellow'),
+    ('HIGH', 'High waste risk - reduce quantity.', 'red'),
 )
 
 
@@ -196,10 +207,11 @@ def _fallback_response(item_name: str, business_type: str) -> dict:
 # ---- ENDPOINTS -----------------------------------------
 
 @app.get('/api/health')
-def health_check():
+async def health_check():
     return {
         'status': 'healthy' if MODEL_HEALTHY else 'degraded',
         'model_loaded': MODEL_HEALTHY,
+        'model_warm': _predict_7_days is not None,
         'model_error': MODEL_ERROR,
         'timestamp': datetime.now().isoformat(),
         'version': '3.0.0',
@@ -207,40 +219,55 @@ def health_check():
 
 
 @app.post('/api/predict-week')
-def predict_week(req: WeekForecastRequest):
+async def predict_week(req: WeekForecastRequest):
     if not MODEL_HEALTHY:
         return _fallback_response(req.item_name, req.business_type)
+    cache_key = (req.item_name, req.business_type, round(req.price, 2),
+                 round(req.shelf_life_hours, 2), req.starting_date,
+                 tuple(req.weather_forecast), tuple(req.holiday_flags))
+    cached = FORECAST_CACHE.get(cache_key)
+    if cached is not None:
+        return ORJSONResponse(cached)
+    if _predict_7_days is None and await run_in_threadpool(_load_model) is None:
+        return _fallback_response(req.item_name, req.business_type)
     try:
-        forecast = predict_7_days(
-            item_name = req.item_name,
-            business_type = req.business_type,
-            price = req.price,
-            shelf_life_hours = req.shelf_life_hours,
-            starting_date = req.starting_date,
-            weather_forecast = list(req.weather_forecast),
-            holiday_flags = list(req.holiday_flags),
+        # CPU-bound model call — run it off the event loop so concurrent
+        # requests to the lightweight endpoints are not serialized behind it.
+        forecast = await run_in_threadpool(
+            _cached_predict,
+            req.item_name, req.business_type, req.price, req.shelf_life_hours,
+            req.starting_date, tuple(req.weather_forecast), tuple(req.holiday_flags),
         )
         LAST_VALID_FORECASTS[f"{req.item_name}::{req.business_type}"] = {'forecast': forecast}
-        return {'success': True, 'fallback': False, 'forecast': forecast}
+        response = {'success': True, 'fallback': False, 'forecast': forecast}
+        FORECAST_CACHE[cache_key] = response
+        # Responses are trusted server-generated dicts — returning ORJSONResponse
+        # directly skips FastAPI's jsonable_encoder/re-validation pass.
+        return ORJSONResponse(response)
     except Exception as e:
-        raise HTTPException(status_code=500, detail={
-            'success': False, 'error': str(e), 'traceback': traceback.format_exc()
-        })
+        logger.exception('predict_week failed')
+        detail = {'success': False, 'error': str(e)}
+        if DEBUG:
+            detail['traceback'] = traceback.format_exc()
+        raise HTTPException(status_code=500, detail=detail)
 
 
 @app.post('/api/predict')
-def predict_single(req: SinglePredictRequest):
+async def predict_single(req: SinglePredictRequest):
     if not MODEL_HEALTHY:
         return _fallback_response(req.item_name, req.business_type)
+    cache_key = (req.item_name, req.business_type, round(req.price, 2),
+                 round(req.shelf_life_hours, 2), req.date, req.weather, req.is_holiday)
+    cached = FORECAST_CACHE.get(cache_key)
+    if cached is not None:
+        return ORJSONResponse(cached)
+    if _predict_7_days is None and await run_in_threadpool(_load_model) is None:
+        return _fallback_response(req.item_name, req.business_type)
     try:
-        forecast = predict_7_days(
-            item_name = req.item_name,
-            business_type = req.business_type,
-            price = req.price,
-            shelf_life_hours = req.shelf_life_hours,
-            starting_date = req.date,
-            weather_forecast = [req.weather] * 7,
-            holiday_flags = [req.is_holiday] + [0] * 6,
+        forecast = await run_in_threadpool(
+            _cached_predict,
+            req.item_name, req.business_type, req.price, req.shelf_life_hours,
+            req.date, (req.weather,) * 7, (req.is_holiday, 0, 0, 0, 0, 0, 0),
         )
         day1 = forecast[0]
         result = {
@@ -255,15 +282,18 @@ def predict_single(req: SinglePredictRequest):
             'is_new_item': day1['is_new_item'],
         }
         LAST_VALID_FORECASTS[f"{req.item_name}::{req.business_type}"] = result
-        return result
+        FORECAST_CACHE[cache_key] = result
+        return ORJSONResponse(result)
     except Exception as e:
-        raise HTTPException(status_code=500, detail={
-            'success': False, 'error': str(e), 'traceback': traceback.format_exc()
-        })
+        logger.exception('predict_single failed')
+        detail = {'success': False, 'error': str(e)}
+        if DEBUG:
+            detail['traceback'] = traceback.format_exc()
+        raise HTTPException(status_code=500, detail=detail)
 
 
 @app.post('/api/risk-alert')
-def waste_risk_alert(req: RiskAlertRequest):
+async def waste_risk_alert(req: RiskAlertRequest):
     try:
         if req.planned_quantity == 0:
             return {
@@ -276,12 +306,8 @@ def waste_risk_alert(req: RiskAlertRequest):
             }
         waste_pct = ((req.planned_quantity - req.predicted_demand) / req.planned_quantity) * 100
         expected_waste = max(0, req.planned_quantity - req.predicted_demand)
-        if waste_pct > 15:
-            risk_level, message, color = 'HIGH', 'High waste risk - reduce quantity.', 'red'
-        elif waste_pct > 5:
-            risk_level, message, color = 'MEDIUM', 'Moderate waste risk - consider reducing.', 'yellow'
-        else:
-            risk_level, message, color = 'LOW', 'Good planning - minimal waste expected.', 'green'
+        idx = int(np.searchsorted(_RISK_THRESHOLDS, waste_pct, side='left'))
+        risk_level, message, color = _RISK_LEVELS[idx]
         return {
             'success': True,
             'risk_level': risk_level,
@@ -295,7 +321,7 @@ def waste_risk_alert(req: RiskAlertRequest):
 
 
 @app.post('/api/recommend')
-def smart_recommendation(req: RecommendRequest):
+async def smart_recommendation(req: RecommendRequest):
     try:
         recommended_qty = round(req.predicted_demand * 1.05)
         difference = recommended_qty - req.current_plan
@@ -323,17 +349,17 @@ def smart_recommendation(req: RecommendRequest):
 
 
 @app.post('/api/accuracy')
-def get_accuracy(req: AccuracyRequest):
+async def get_accuracy(req: AccuracyRequest):
     try:
-        metrics_path = os.path.join(DATA_DIR, 'model_metrics.json')
-        if not os.path.exists(metrics_path):
+        history = _load_metrics_history(os.path.join(DATA_DIR, 'model_metrics.ndjson'))
+        if history is None:
+            history = _load_metrics_history(os.path.join(DATA_DIR, 'model_metrics.json'))
+        if history is None:
             return {
                 'success': True,
                 'message': 'No accuracy logs yet. They are written by monitoring.py after daily sales.',
                 'metrics': None,
             }
-        with open(metrics_path, 'r') as f:
-            history = json.load(f)
         if req.item_name:
             history = [m for m in history if m.get('item_name') == req.item_name]
         if req.business_type:
@@ -341,9 +367,12 @@ def get_accuracy(req: AccuracyRequest):
         recent = history[-req.n_recent:] if history else []
         if not recent:
             return {'success': True, 'message': 'No matching records found.', 'metrics': None}
-        avg_mape = round(float(np.mean([m['mape'] for m in recent])), 2)
-        avg_mae = round(float(np.mean([m['mae'] for m in recent])), 2)
-        avg_r2 = round(float(np.mean([m['r2'] for m in recent])), 3)
+        # One pass over `recent` and one reduction for all three averages
+        arr = np.array([(m['mape'], m['mae'], m['r2']) for m in recent], dtype=np.float32)
+        mape_mean, mae_mean, r2_mean = arr.mean(axis=0).tolist()
+        avg_mape = round(mape_mean, 2)
+        avg_mae = round(mae_mean, 2)
+        avg_r2 = round(r2_mean, 3)
         alert = avg_mape > 25
         return {
             'success': True,
@@ -361,8 +390,27 @@ def get_accuracy(req: AccuracyRequest):
         raise HTTPException(status_code=500, detail={'success': False, 'error': str(e)})
 
 
+@app.get('/api/cache/stats')
+async def cache_stats():
+    return {
+        'success': True,
+        'forecast_cache': {'size': len(FORECAST_CACHE), 'maxsize': FORECAST_CACHE.maxsize},
+        'last_valid_forecasts': {'size': len(LAST_VALID_FORECASTS),
+                                 'maxsize': LAST_VALID_FORECASTS.maxsize},
+        'predict_lru': _cached_predict.cache_info()._asdict(),
+    }
+
+
+@app.post('/api/cache/invalidate')
+async def invalidate_forecast_cache():
+    n = len(FORECAST_CACHE) + _cached_predict.cache_info().currsize
+    FORECAST_CACHE.clear()
+    _cached_predict.cache_clear()
+    return {'success': True, 'invalidated': n}
+
+
 @app.post('/api/retrain')
-def trigger_retrain(req: RetrainRequest, background_tasks: BackgroundTasks):
+async def trigger_retrain(req: RetrainRequest, background_tasks: BackgroundTasks):
     if not os.path.exists(req.new_data_path):
         raise HTTPException(status_code=400, detail={
             'success': False,
@@ -377,6 +425,8 @@ def trigger_retrain(req: RetrainRequest, background_tasks: BackgroundTasks):
             if result.get('deployed'):
                 MODEL_HEALTHY = True
                 MODEL_ERROR = None
+                FORECAST_CACHE.clear()
+                _cached_predict.cache_clear()
                 print(f" New model deployed. MAPE: {result['new_mape']}%")
             else:
                 print(f" Existing model kept. Reason: {result.get('reason')}")
@@ -398,4 +448,11 @@ if __name__ == '__main__':
     print("Endpoints: /api/health, /api/predict, /api/predict-week,")
     print("   /api/risk-alert, /api/recommend, /api/accuracy, /api/retrain")
     print("Docs: http://localhost:8000/docs\n")
-    uvicorn.run('api:app', host='0.0.0.0', port=8000, reload=True)
+    # uvloop + httptools and no reloader for production throughput; clients
+    # should reuse keep-alive connections instead of reconnecting per request.
+    uvicorn.run(
+        'api:app', host='0.0.0.0', port=8000,
+        workers=os.cpu_count(), loop='uvloop', http='httptools',
+        limit_concurrency=1024, backlog=4096,
+        log_level='warning', reload=False,
+    )
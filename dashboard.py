@@ -7,12 +7,19 @@
 
 import streamlit as st
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter, Retry
 from datetime import date, timedelta
-import pandas as pd
 
 # ── CONFIG ────────────────────────────────────────────────────────────────────
 API_URL = "http://localhost:8000"
 
+# One pooled Session for the whole Streamlit process — reruns reuse
+# keep-alive connections instead of opening a fresh TCP connection per call.
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10,
+                                      max_retries=Retry(total=2, backoff_factor=0.2)))
+
 st.set_page_config(
     page_title="PrepPal AI Dashboard",
     page_icon="🍽️",
@@ -21,7 +28,11 @@ st.set_page_config(
 )
 
 # ── CUSTOM STYLES ─────────────────────────────────────────────────────────────
-st.markdown("""
+@st.cache_resource
+def _css() -> str:
+    # Interned once per process; reruns reuse the same string object
+    # instead of rebuilding the multi-KB style block each time.
+    return """
 <style>
     @import url('https://fonts.googleapis.com/css2?family=DM+Sans:wght@300;400;500;600;700&family=DM+Mono:wght@400;500&display=swap');
 
@@ -181,52 +192,72 @@ st.markdown("""
         color: #f1f5f9 !important;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+
+st.markdown(_css(), unsafe_allow_html=True)
 
 
 # ── HELPERS ───────────────────────────────────────────────────────────────────
-def check_health():
+def _get(path, timeout):
     try:
-        r = requests.get(f"{API_URL}/api/health", timeout=3)
+        r = _SESSION.get(f"{API_URL}{path}", timeout=timeout)
         return r.json() if r.status_code == 200 else None
     except Exception:
         return None
 
 
-def call_predict(payload):
+def _post(path, payload, timeout):
     try:
-        r = requests.post(f"{API_URL}/api/predict", json=payload, timeout=10)
+        r = _SESSION.post(f"{API_URL}{path}", json=payload, timeout=timeout)
         return r.json() if r.status_code == 200 else None
     except Exception:
         return None
 
 
-def call_predict_week(payload):
-    try:
-        r = requests.post(f"{API_URL}/api/predict-week", json=payload, timeout=10)
-        return r.json() if r.status_code == 200 else None
-    except Exception:
-        return None
+# Short TTL on health: the sidebar pill doesn't need a fresh round-trip
+# on every widget change, ~4 checks/minute is plenty.
+@st.cache_data(ttl=15, show_spinner=False)
+def check_health():
+    return _get("/api/health", timeout=3)
+
+
+# Predictions are deterministic for a given payload, so identical inputs
+# within 5 minutes are served from Streamlit's cache without hitting the API.
+@st.cache_data(ttl=300, show_spinner=False)
+def call_predict(payload):
+    return _post("/api/predict", payload, timeout=10)
+
 
+@st.cache_data(ttl=300, show_spinner=False)
+def get_week_forecast(payload):
+    """Fetch the 7-day forecast and prebuild its chart frame, cached as one unit."""
+    # pandas is only needed for the chart frame — importing here keeps it
+    # off the empty-state rerun path (sys.modules makes repeats free).
+    import pandas as pd
 
+    week_result = _post("/api/predict-week", payload, timeout=10)
+    if not week_result or not week_result.get("success"):
+        return week_result, None
+    forecast = week_result["forecast"]
+    chart_df = pd.DataFrame({
+        "Day":    [d["day_name"] for d in forecast],
+        "Demand": [d["predicted_demand"] for d in forecast],
+        "Recommended": [d["recommended_quantity"] for d in forecast],
+    }).set_index("Day")
+    return week_result, chart_df
+
+
+@st.cache_data(ttl=300, show_spinner=False)
 def call_risk(predicted, planned):
-    try:
-        r = requests.post(f"{API_URL}/api/risk-alert",
-                          json={"predicted_demand": predicted, "planned_quantity": planned},
-                          timeout=5)
-        return r.json() if r.status_code == 200 else None
-    except Exception:
-        return None
+    return _post("/api/risk-alert",
+                 {"predicted_demand": predicted, "planned_quantity": planned}, timeout=5)
 
 
+@st.cache_data(ttl=300, show_spinner=False)
 def call_recommend(predicted, current_plan):
-    try:
-        r = requests.post(f"{API_URL}/api/recommend",
-                          json={"predicted_demand": predicted, "current_plan": current_plan},
-                          timeout=5)
-        return r.json() if r.status_code == 200 else None
-    except Exception:
-        return None
+    return _post("/api/recommend",
+                 {"predicted_demand": predicted, "current_plan": current_plan}, timeout=5)
 
 
 def confidence_class(c):
@@ -246,23 +277,27 @@ with st.sidebar:
         st.error("Start your API: uvicorn api:app --port 8000")
 
     st.markdown("---")
-    st.markdown('<div class="section-header">Item Details</div>', unsafe_allow_html=True)
 
-    item_name = st.text_input("Item Name", value="Jollof Rice")
-    business_type = st.selectbox("Business Type", ["Restaurant", "Cafe", "Bakery"])
-    price = st.number_input("Price (GHS)", min_value=1.0, value=50.0, step=5.0)
-    shelf_life = st.number_input("Shelf Life (hours)", min_value=0.1, value=4.0, step=0.5)
+    # A form batches the widgets: editing inputs no longer reruns the
+    # whole script — only pressing Run Prediction does.
+    with st.form("preppal_inputs", clear_on_submit=False):
+        st.markdown('<div class="section-header">Item Details</div>', unsafe_allow_html=True)
 
-    st.markdown("---")
-    st.markdown('<div class="section-header">Conditions</div>', unsafe_allow_html=True)
+        item_name = st.text_input("Item Name", value="Jollof Rice")
+        business_type = st.selectbox("Business Type", ["Restaurant", "Cafe", "Bakery"])
+        price = st.number_input("Price (GHS)", min_value=1.0, value=50.0, step=5.0)
+        shelf_life = st.number_input("Shelf Life (hours)", min_value=0.1, value=4.0, step=0.5)
 
-    pred_date = st.date_input("Date", value=date.today() + timedelta(days=1))
-    weather = st.selectbox("Weather", ["Clear", "Rainy"])
-    is_holiday = st.checkbox("Public Holiday")
-    planned_qty = st.number_input("Your Planned Quantity", min_value=0, value=50, step=1)
+        st.markdown("---")
+        st.markdown('<div class="section-header">Conditions</div>', unsafe_allow_html=True)
 
-    st.markdown("---")
-    predict_btn = st.button("Run Prediction")
+        pred_date = st.date_input("Date", value=date.today() + timedelta(days=1))
+        weather = st.selectbox("Weather", ["Clear", "Rainy"])
+        is_holiday = st.checkbox("Public Holiday")
+        planned_qty = st.number_input("Your Planned Quantity", min_value=0, value=50, step=1)
+
+        st.markdown("---")
+        predict_btn = st.form_submit_button("Run Prediction")
 
 
 # ── MAIN ──────────────────────────────────────────────────────────────────────
@@ -272,28 +307,26 @@ st.markdown('<div class="hero-sub">Smart demand forecasting for restaurants, caf
 if not predict_btn:
     # Empty state
     st.markdown("---")
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.markdown("""
-        <div class="metric-card">
+    # One markdown element for the whole card row — one protobuf round
+    # trip to the browser instead of three.
+    st.markdown("""
+    <div style="display:flex; gap:1rem">
+        <div class="metric-card" style="flex:1">
             <div class="metric-value">8.12%</div>
             <div class="metric-label">Model MAPE</div>
             <div class="metric-sub">59% better than target</div>
-        </div>""", unsafe_allow_html=True)
-    with col2:
-        st.markdown("""
-        <div class="metric-card">
+        </div>
+        <div class="metric-card" style="flex:1">
             <div class="metric-value">34</div>
             <div class="metric-label">Features</div>
             <div class="metric-sub">Engineered for accuracy</div>
-        </div>""", unsafe_allow_html=True)
-    with col3:
-        st.markdown("""
-        <div class="metric-card">
+        </div>
+        <div class="metric-card" style="flex:1">
             <div class="metric-value">7</div>
             <div class="metric-label">API Endpoints</div>
             <div class="metric-sub">All PRD requirements met</div>
-        </div>""", unsafe_allow_html=True)
+        </div>
+    </div>""", unsafe_allow_html=True)
 
     st.markdown("---")
     st.markdown("#### 👈 Fill in the item details and click **Run Prediction** to get started")
@@ -324,38 +357,32 @@ else:
     # ── METRICS ROW ──────────────────────────────────────────────────────────
     st.markdown('<div class="section-header">Tomorrow\'s Forecast</div>', unsafe_allow_html=True)
 
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.markdown(f"""
-        <div class="metric-card">
+    conf_cls = confidence_class(confidence)
+    item_type = "New Item" if is_new else "Known Item"
+    item_color = "#fbbf24" if is_new else "#4ade80"
+    st.markdown(f"""
+    <div style="display:flex; gap:1rem">
+        <div class="metric-card" style="flex:1">
             <div class="metric-value">{predicted}</div>
             <div class="metric-label">Predicted Demand</div>
             <div class="metric-sub">units expected</div>
-        </div>""", unsafe_allow_html=True)
-    with col2:
-        st.markdown(f"""
-        <div class="metric-card">
+        </div>
+        <div class="metric-card" style="flex:1">
             <div class="metric-value">{recommended}</div>
             <div class="metric-label">Recommended Qty</div>
             <div class="metric-sub">with 5% buffer</div>
-        </div>""", unsafe_allow_html=True)
-    with col3:
-        conf_cls = confidence_class(confidence)
-        st.markdown(f"""
-        <div class="metric-card">
+        </div>
+        <div class="metric-card" style="flex:1">
             <div class="metric-value"><span class="{conf_cls}">{confidence}</span></div>
             <div class="metric-label">Confidence</div>
             <div class="metric-sub">{result['confidence_score']*100:.0f}% score</div>
-        </div>""", unsafe_allow_html=True)
-    with col4:
-        item_type = "New Item" if is_new else "Known Item"
-        item_color = "#fbbf24" if is_new else "#4ade80"
-        st.markdown(f"""
-        <div class="metric-card">
+        </div>
+        <div class="metric-card" style="flex:1">
             <div class="metric-value" style="font-size:1.4rem; color:{item_color}">{item_type}</div>
             <div class="metric-label">Item Status</div>
             <div class="metric-sub">{item_name}</div>
-        </div>""", unsafe_allow_html=True)
+        </div>
+    </div>""", unsafe_allow_html=True)
 
     if explanation:
         st.markdown(f'<div class="explain-box">💡 {explanation}</div>', unsafe_allow_html=True)
@@ -363,11 +390,29 @@ else:
     st.markdown("<br>", unsafe_allow_html=True)
 
     # ── RISK + RECOMMENDATION ─────────────────────────────────────────────────
+    # The three follow-up calls are independent, I/O-bound requests — run
+    # them concurrently so the wait is the slowest call, not the sum.
+    with st.spinner("Loading analysis..."):
+        with ThreadPoolExecutor(max_workers=3) as ex:
+            f_risk = ex.submit(call_risk, predicted, planned_qty)
+            f_rec = ex.submit(call_recommend, predicted, planned_qty)
+            f_week = ex.submit(get_week_forecast, {
+                "item_name":        item_name,
+                "business_type":    business_type,
+                "price":            price,
+                "shelf_life_hours": shelf_life,
+                "starting_date":    str(pred_date),
+                "weather_forecast": [weather] * 7,
+                "holiday_flags":    [1 if is_holiday else 0] + [0] * 6,
+            })
+            risk = f_risk.result()
+            rec = f_rec.result()
+            week_result, chart_df = f_week.result()
+
     col_risk, col_rec = st.columns(2)
 
     with col_risk:
         st.markdown('<div class="section-header">Waste Risk Alert</div>', unsafe_allow_html=True)
-        risk = call_risk(predicted, planned_qty)
         if risk and risk.get("success"):
             level = risk["risk_level"]
             cls   = {"HIGH": "risk-high", "MEDIUM": "risk-medium", "LOW": "risk-low"}.get(level, "risk-low")
@@ -381,7 +426,6 @@ else:
 
     with col_rec:
         st.markdown('<div class="section-header">Smart Recommendation</div>', unsafe_allow_html=True)
-        rec = call_recommend(predicted, planned_qty)
         if rec and rec.get("success"):
             action = rec["action"]
             if "REDUCE" in action:
@@ -402,41 +446,26 @@ else:
     # ── 7-DAY FORECAST ────────────────────────────────────────────────────────
     st.markdown('<div class="section-header">7-Day Forecast</div>', unsafe_allow_html=True)
 
-    with st.spinner("Loading 7-day forecast..."):
-        week_result = call_predict_week({
-            "item_name":        item_name,
-            "business_type":    business_type,
-            "price":            price,
-            "shelf_life_hours": shelf_life,
-            "starting_date":    str(pred_date),
-            "weather_forecast": [weather] * 7,
-            "holiday_flags":    [1 if is_holiday else 0] + [0] * 6,
-        })
-
     if week_result and week_result.get("success"):
         forecast = week_result["forecast"]
 
-        # Chart
-        chart_df = pd.DataFrame({
-            "Day":    [d["day_name"] for d in forecast],
-            "Demand": [d["predicted_demand"] for d in forecast],
-            "Recommended": [d["recommended_quantity"] for d in forecast],
-        }).set_index("Day")
+        # Chart frame comes prebuilt (and cached) from get_week_forecast
         st.line_chart(chart_df, color=["#4ade80", "#22d3ee"])
 
-        # Table rows
-        st.markdown("<br>", unsafe_allow_html=True)
+        # Table rows — all seven emitted as one markdown element
+        rows_html = []
         for d in forecast:
             conf_cls  = confidence_class(d["confidence"])
             weather_icon = "🌧️" if d["weather"] == "Rainy" else "☀️"
             holiday_icon = "🎉" if d["is_holiday"] == "Yes" else ""
-            st.markdown(f"""
+            rows_html.append(f"""
             <div class="forecast-row">
                 <div class="day-name">{d['day_name'][:3]} {holiday_icon}</div>
                 <div class="day-demand">{d['predicted_demand']}</div>
                 <div class="day-rec">rec: {d['recommended_quantity']} &nbsp; {weather_icon}</div>
                 <div class="day-conf"><span class="{conf_cls}">{d['confidence']}</span></div>
-            </div>""", unsafe_allow_html=True)
+            </div>""")
+        st.markdown("<br>" + "".join(rows_html), unsafe_allow_html=True)
     else:
         st.warning("Could not load 7-day forecast.")
 
@@ -1,8 +1,10 @@
 # feature_engineering.py
 # Run this SECOND (after data_validation.py)
-# Creates: processed_data_with_features_v3.csv, category_label_encoder.pkl, business_label_encoder.pkl
+# Creates: processed_data_with_features_v3.parquet (+ CSV copy), category_label_encoder.pkl, business_label_encoder.pkl
 
 import os
+import re
+
 import numpy as np
 import pandas as pd
 import joblib
@@ -17,6 +19,10 @@ cafe_bakery_df = pd.read_csv(os.path.join(DATA_DIR, 'cafe_bakery_sales_dataset.c
 
 df = pd.concat([restaurant_df, cafe_bakery_df], ignore_index=True)
 df['date'] = pd.to_datetime(df['date'])
+# Category dtype turns every equality/groupby below into integer-code
+# compares instead of Python string comparisons.
+for c in ['weather_condition', 'business_type', 'item_name']:
+    df[c] = df[c].astype('category')
 print(f"Combined: {df.shape} | Business types: {sorted(df['business_type'].unique())}")
 
 # ---- ENCODERS -----------------------------------
@@ -46,26 +52,18 @@ ITEM_FEATURE_MAP = {
 }
 
 
-def guess_item_features(item_name, price, shelf_life_hours):
-    f = {'category': 'main_meal', 'preparation_complexity': 2}
-    if shelf_life_hours < 2:
-        f.update({'category': 'beverage', 'preparation_complexity': 1})
-    elif shelf_life_hours > 24:
-        f.update({'category': 'bakery', 'preparation_complexity': 3})
-    elif shelf_life_hours > 12:
-        f.update({'category': 'dessert', 'preparation_complexity': 3})
-    elif price < 25:
-        f.update({'category': 'side_dish', 'preparation_complexity': 1})
-    n = item_name.lower()
-    if any(w in n for w in ['coffee', 'tea', 'juice', 'smoothie', 'latte', 'espresso', 'drink']):
-        f.update({'category': 'beverage', 'preparation_complexity': 1})
-    elif any(w in n for w in ['bread', 'loaf']):
-        f.update({'category': 'bakery', 'preparation_complexity': 4})
-    elif any(w in n for w in ['cake', 'donut', 'cookie', 'muffin', 'pastry', 'pie']):
-        f.update({'category': 'dessert', 'preparation_complexity': 3})
-    elif any(w in n for w in ['sandwich', 'wrap', 'roll']):
-        f.update({'category': 'light_meal', 'preparation_complexity': 2})
-    return f
+# All keyword buckets in one alternation, shared with forecasting.py's
+# scalar guesser
+CAT_RE = re.compile(
+    r'(?P<beverage>coffee|tea|juice|smoothie|latte|espresso|drink)'
+    r'|(?P<bakery>bread|loaf)'
+    r'|(?P<dessert>cake|donut|cookie|muffin|pastry|pie)'
+    r'|(?P<light_meal>sandwich|wrap|roll)')
+
+# Scalar lookups split out of ITEM_FEATURE_MAP so the bulk pipeline can
+# resolve known items with two Series.map calls.
+CAT_MAP = {k: v['category'] for k, v in ITEM_FEATURE_MAP.items()}
+COMPLEXITY_MAP = {k: v['preparation_complexity'] for k, v in ITEM_FEATURE_MAP.items()}
 
 
 # --- FEATURE ENGINEERING -----------------------------------
@@ -73,7 +71,6 @@ print("Engineering features...")
 
 # Time
 df['day_of_week'] = df['date'].dt.dayofweek
-df['day_name'] = df['date'].dt.day_name()
 df['month'] = df['date'].dt.month
 df['week_of_year'] = df['date'].dt.isocalendar().week
 df['day_of_month'] = df['date'].dt.day
@@ -83,41 +80,64 @@ df['is_friday'] = (df['day_of_week'] == 4).astype(int)
 df['is_saturday'] = (df['day_of_week'] == 5).astype(int)
 df['is_sunday'] = (df['day_of_week'] == 6).astype(int)
 
-# Weather
-df['is_rainy'] = (df['weather_condition'] == 'Rainy').astype(int)
-
-# Item characteristics
-def get_item_features(row):
-    if row['item_name'] in ITEM_FEATURE_MAP:
-        return ITEM_FEATURE_MAP[row['item_name']]
-    return guess_item_features(row['item_name'], row['price'], row['shelf_life_hours'])
+# Weather — compare the int8 category codes rather than the strings
+_rainy = df['weather_condition'].cat.categories.get_indexer(['Rainy'])[0]  # -1 if absent
+if _rainy >= 0:
+    df['is_rainy'] = (df['weather_condition'].cat.codes == _rainy).astype('uint8')
+else:
+    df['is_rainy'] = np.zeros(len(df), dtype='uint8')
+
+# Item characteristics — known items resolve through map; unknown items
+# get the shelf-life/price rules and keyword buckets column-wise, so no
+# per-row Python function runs.
+df['category'] = df['item_name'].map(CAT_MAP)
+df['preparation_complexity'] = df['item_name'].map(COMPLEXITY_MAP)
+
+unknown = df['category'].isna()
+if unknown.any():
+    shelf = df.loc[unknown, 'shelf_life_hours'].to_numpy()
+    price = df.loc[unknown, 'price'].to_numpy()
+    conds = [shelf < 2, shelf > 24, shelf > 12, price < 25]
+    cats = np.select(conds, ['beverage', 'bakery', 'dessert', 'side_dish'], default='main_meal')
+    comps = np.select(conds, [1, 3, 3, 1], default=2)
+
+    # Keyword buckets override the numeric guess — one combined
+    # alternation pass; the matched named group identifies the bucket.
+    kw = df.loc[unknown, 'item_name'].str.lower().str.extract(CAT_RE)
+    kw_conds = [
+        kw['beverage'].notna(),
+        kw['bakery'].notna(),
+        kw['dessert'].notna(),
+        kw['light_meal'].notna(),
+    ]
+    cats = np.select(kw_conds, ['beverage', 'bakery', 'dessert', 'light_meal'], default=cats)
+    comps = np.select(kw_conds, [1, 4, 3, 2], default=comps)
+
+    df.loc[unknown, 'category'] = cats
+    df.loc[unknown, 'preparation_complexity'] = comps
 
-item_feats = df.apply(get_item_features, axis=1, result_type='expand')
-df['category'] = item_feats['category']
-df['preparation_complexity'] = item_feats['preparation_complexity']
 df['category_encoded'] = category_encoder.transform(df['category'])
 df['business_encoded'] = biz_encoder.transform(df['business_type'])
 
-# Lag features
+# Lag features — one grouping instead of a boolean mask scan per
+# (business, item) pair; shift/rolling run in pandas' cython group kernels.
 df = df.sort_values(['business_type', 'item_name', 'date']).reset_index(drop=True)
-for biz in df['business_type'].unique():
-    for item in df[df['business_type'] == biz]['item_name'].unique():
-        mask = (df['business_type'] == biz) & (df['item_name'] == item)
-        df.loc[mask, 'prev_day_demand'] = df.loc[mask, 'customer_demand'].shift(1)
-        df.loc[mask, 'prev_day_sold'] = df.loc[mask, 'quantity_sold'].shift(1)
-        df.loc[mask, 'prev_day_waste'] = df.loc[mask, 'waste_quantity'].shift(1)
-        df.loc[mask, 'prev_week_demand'] = df.loc[mask, 'customer_demand'].shift(7)
+g = df.groupby(['business_type', 'item_name'], sort=False, observed=True)
+gd = g['customer_demand']
+
+df['prev_day_demand'] = gd.shift(1)
+df['prev_day_sold'] = g['quantity_sold'].shift(1)
+df['prev_day_waste'] = g['waste_quantity'].shift(1)
+df['prev_week_demand'] = gd.shift(7)
 
 # Rolling features
-for biz in df['business_type'].unique():
-    for item in df[df['business_type'] == biz]['item_name'].unique():
-        mask = (df['business_type'] == biz) & (df['item_name'] == item)
-        df.loc[mask, 'rolling_3day_demand'] = df.loc[mask, 'customer_demand'].rolling(3,  min_periods=1).mean()
-        df.loc[mask, 'rolling_7day_demand'] = df.loc[mask, 'customer_demand'].rolling(7,  min_periods=1).mean()
-        df.loc[mask, 'rolling_14day_demand'] = df.loc[mask, 'customer_demand'].rolling(14, min_periods=1).mean()
-        df.loc[mask, 'rolling_30day_demand'] = df.loc[mask, 'customer_demand'].rolling(30, min_periods=1).mean()
-        df.loc[mask, 'rolling_7day_std'] = df.loc[mask, 'customer_demand'].rolling(7,  min_periods=1).std()
-        df.loc[mask, 'rolling_14day_std'] = df.loc[mask, 'customer_demand'].rolling(14, min_periods=1).std()
+rolling = gd.rolling
+df['rolling_3day_demand'] = rolling(3,  min_periods=1).mean().reset_index(level=[0, 1], drop=True)
+df['rolling_7day_demand'] = rolling(7,  min_periods=1).mean().reset_index(level=[0, 1], drop=True)
+df['rolling_14day_demand'] = rolling(14, min_periods=1).mean().reset_index(level=[0, 1], drop=True)
+df['rolling_30day_demand'] = rolling(30, min_periods=1).mean().reset_index(level=[0, 1], drop=True)
+df['rolling_7day_std'] = rolling(7,  min_periods=1).std().reset_index(level=[0, 1], drop=True)
+df['rolling_14day_std'] = rolling(14, min_periods=1).std().reset_index(level=[0, 1], drop=True)
 
 # Interactions
 df['weekend_x_holiday'] = df['is_weekend'] * df['holiday_flag']
@@ -125,15 +145,25 @@ df['rainy_x_weekend'] = df['is_rainy']   * df['is_weekend']
 df['rainy_x_holiday'] = df['is_rainy']   * df['holiday_flag']
 df['friday_x_weekend'] = df['is_friday']  * df['is_weekend']
 
-# Cyclical
-df['day_sin'] = np.sin(2 * np.pi * df['day_of_week'] / 7)
-df['day_cos'] = np.cos(2 * np.pi * df['day_of_week'] / 7)
-df['month_sin'] = np.sin(2 * np.pi * df['month'] / 12)
-df['month_cos'] = np.cos(2 * np.pi * df['month'] / 12)
+# Cyclical — day_of_week and month take only 7/12 distinct values, so
+# index small sin/cos tables instead of evaluating libm over every row.
+DOW_SIN = np.sin(2 * np.pi * np.arange(7) / 7)
+DOW_COS = np.cos(2 * np.pi * np.arange(7) / 7)
+MONTH_SIN = np.sin(2 * np.pi * np.arange(13) / 12)  # indexed by month, 0 unused
+MONTH_COS = np.cos(2 * np.pi * np.arange(13) / 12)
+
+df['day_sin'] = DOW_SIN[df['day_of_week'].to_numpy()]
+df['day_cos'] = DOW_COS[df['day_of_week'].to_numpy()]
+df['month_sin'] = MONTH_SIN[df['month'].to_numpy()]
+df['month_cos'] = MONTH_COS[df['month'].to_numpy()]
 
 df = df.fillna(0)
 
 # -----SAVE -----------------------------------------
+# Parquet keeps the category/narrow dtypes and skips text parsing on
+# reload; the CSV stays alongside for tooling and older checkouts.
+df.to_parquet(os.path.join(DATA_DIR, 'processed_data_with_features_v3.parquet'),
+              engine='pyarrow', compression='snappy', index=False)
 df.to_csv(os.path.join(DATA_DIR, 'processed_data_with_features_v3.csv'), index=False)
 joblib.dump(category_encoder, os.path.join(DATA_DIR, 'category_label_encoder.pkl'))
 joblib.dump(biz_encoder, os.path.join(DATA_DIR, 'business_label_encoder.pkl'))
@@ -141,7 +171,7 @@ joblib.dump(biz_encoder, os.path.join(DATA_DIR, 'business_label_encoder.pkl'))
 print("=" * 50)
 print("FEATURE ENGINEERING COMPLETE")
 print(f"Saved to: {DATA_DIR}")
-print(f"processed_data_with_features_v3.csv  {df.shape}")
+print(f"processed_data_with_features_v3.parquet  {df.shape}")
 print(f"category_label_encoder.pkl")
 print(f"business_label_encoder.pkl")
 print("=" * 50)
@@ -3,10 +3,12 @@
 # Run standalone to test: python forecasting.py
 
 import os
+import re
+
 import numpy as np
 import pandas as pd
 import joblib
-from datetime import timedelta
+import xgboost as xgb
 
 DATA_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -22,16 +24,35 @@ except FileNotFoundError as e:
         "Run feature_engineering.py then model_training_and_ensemble.py first.\n"
     )
 
+# Arrow's multithreaded reader with an explicit schema: dates parse at
+# load and the string columns stay dictionary-encoded.
+_HISTORY_DTYPES = {
+    'business_type': 'category', 'item_name': 'category',
+    'weather_condition': 'category',
+    'price': 'float32', 'shelf_life_hours': 'float32',
+}
+
+_HISTORY_PARQUET = os.path.join(DATA_DIR, 'processed_data_with_features_v3.parquet')
 try:
-    df_history = pd.read_csv(os.path.join(DATA_DIR, 'processed_data_with_features_v3.csv'))
-    df_history['date'] = pd.to_datetime(df_history['date'])
+    if os.path.exists(_HISTORY_PARQUET):
+        # Parquet round-trips the dtypes set at feature time, no parsing
+        df_history = pd.read_parquet(_HISTORY_PARQUET, engine='pyarrow')
+    else:
+        df_history = pd.read_csv(os.path.join(DATA_DIR, 'processed_data_with_features_v3.csv'),
+                                 engine='pyarrow', parse_dates=['date'], dtype=_HISTORY_DTYPES)
     print(f" Historical data loaded: {len(df_history)} rows")
 except FileNotFoundError:
     raise FileNotFoundError(
-        "\nprocessed_data_with_features_v3.csv not found.\n"
+        "\nprocessed_data_with_features_v3.parquet / .csv not found.\n"
         "Run feature_engineering.py first.\n"
     )
 
+# Cyclical encodings over the 7 weekdays / 12 months, precomputed once
+DOW_SIN = np.sin(2 * np.pi * np.arange(7) / 7)
+DOW_COS = np.cos(2 * np.pi * np.arange(7) / 7)
+MONTH_SIN = np.sin(2 * np.pi * np.arange(13) / 12)  # indexed by month, 0 unused
+MONTH_COS = np.cos(2 * np.pi * np.arange(13) / 12)
+
 # ── ITEM MAP ─────────────────────────────────────────────────────────────────
 ITEM_FEATURE_MAP = {
     'Jollof Rice': {'category': 'main_meal', 'preparation_complexity': 3},
@@ -52,7 +73,26 @@ ITEM_FEATURE_MAP = {
 }
 
 
+# All keyword buckets in one alternation: a single scan of the name
+# instead of four substring loops; the matched group names the bucket.
+CAT_RE = re.compile(
+    r'(?P<beverage>coffee|tea|juice|smoothie|latte|espresso|drink)'
+    r'|(?P<bakery>bread|loaf)'
+    r'|(?P<dessert>cake|donut|cookie|muffin|pastry|pie)'
+    r'|(?P<light_meal>sandwich|wrap|roll)')
+
+_KEYWORD_FEATURES = {
+    'beverage':   {'category': 'beverage', 'preparation_complexity': 1},
+    'bakery':     {'category': 'bakery', 'preparation_complexity': 4},
+    'dessert':    {'category': 'dessert', 'preparation_complexity': 3},
+    'light_meal': {'category': 'light_meal', 'preparation_complexity': 2},
+}
+
+
 def _guess_item_features(item_name, price, shelf_life_hours):
+    m = CAT_RE.search(item_name.lower())
+    if m:
+        return dict(_KEYWORD_FEATURES[m.lastgroup])
     f = {'category': 'main_meal', 'preparation_complexity': 2}
     if shelf_life_hours < 2:
         f.update({'category': 'beverage', 'preparation_complexity': 1})
@@ -62,31 +102,105 @@ def _guess_item_features(item_name, price, shelf_life_hours):
         f.update({'category': 'dessert', 'preparation_complexity': 3})
     elif price < 25:
         f.update({'category': 'side_dish', 'preparation_complexity': 1})
-    n = item_name.lower()
-    if any(w in n for w in ['coffee', 'tea', 'juice', 'smoothie', 'latte', 'espresso', 'drink']):
-        f.update({'category': 'beverage', 'preparation_complexity': 1})
-    elif any(w in n for w in ['bread', 'loaf']):
-        f.update({'category': 'bakery', 'preparation_complexity': 4})
-    elif any(w in n for w in ['cake', 'donut', 'cookie', 'muffin', 'pastry', 'pie']):
-        f.update({'category': 'dessert', 'preparation_complexity': 3})
-    elif any(w in n for w in ['sandwich', 'wrap', 'roll']):
-        f.update({'category': 'light_meal', 'preparation_complexity': 2})
     return f
 
 
+# Last-30-row history per (item, business) precomputed once at import —
+# each forecast call is a dict lookup instead of two full-column mask
+# scans over the history frame.
+_df_sorted = df_history.sort_values('date')
+_RECENT = {key: g.tail(30) for key, g in
+           _df_sorted.groupby(['item_name', 'business_type'], sort=False, observed=True)}
+_BIZ_FALLBACK = {b: g.tail(30) for b, g in
+                 _df_sorted.groupby('business_type', sort=False, observed=True)}
+
+
 def _get_recent_data(item_name, business_type, n_days=30):
-    mask = (df_history['item_name'] == item_name) & (df_history['business_type'] == business_type)
-    recent = df_history[mask].sort_values('date').tail(n_days)
-    if len(recent) == 0:
-        recent = df_history[df_history['business_type'] == business_type].sort_values('date').tail(30)
+    recent = _RECENT.get((item_name, business_type))
+    if recent is None:
+        recent = _BIZ_FALLBACK.get(business_type, df_history.iloc[0:0])
     return recent
 
 
+# Column order of the model's training matrix
+FEATURE_COLS = [
+    'day_of_week', 'month', 'week_of_year', 'day_of_month',
+    'is_weekend', 'is_monday', 'is_friday', 'is_saturday', 'is_sunday',
+    'day_sin', 'day_cos', 'month_sin', 'month_cos',
+    'holiday_flag', 'is_rainy',
+    'category_encoded', 'preparation_complexity', 'business_encoded',
+    'price', 'shelf_life_hours',
+    'prev_day_demand', 'prev_day_sold', 'prev_day_waste', 'prev_week_demand',
+    'rolling_3day_demand', 'rolling_7day_demand',
+    'rolling_14day_demand', 'rolling_30day_demand',
+    'rolling_7day_std', 'rolling_14day_std',
+    'weekend_x_holiday', 'rainy_x_weekend', 'rainy_x_holiday', 'friday_x_weekend',
+]
+FEAT_IDX = {c: i for i, c in enumerate(FEATURE_COLS)}
+
+# When the deployed model is plain XGBoost, predict through the raw
+# Booster on a DMatrix built straight from the ndarray row — skipping
+# the sklearn wrapper's per-call DataFrame validation. Other model
+# types (e.g. an ensemble) keep the DataFrame interface.
+if isinstance(final_model, xgb.XGBRegressor):
+    _BOOSTER = final_model.get_booster()
+
+    def _predict_one(feat_df, X, day):
+        dm = xgb.DMatrix(X[day:day + 1], feature_names=FEATURE_COLS)
+        return _BOOSTER.predict(dm)[0]
+else:
+    def _predict_one(feat_df, X, day):
+        return final_model.predict(feat_df.iloc[day:day + 1])[0]
+
+
+# The autoregressive cells the recursion rewrites each day, bound to
+# column positions once. _fill_ar_row is kept a pure array/scalar
+# kernel — no pandas, no dicts — so it can be wrapped in an njit
+# decorator verbatim should numba ever be added; the model call itself
+# stays outside since XGBoost can't run under a jit anyway.
+_AR_IDX = tuple(FEAT_IDX[c] for c in (
+    'prev_day_demand', 'prev_day_sold', 'prev_day_waste', 'prev_week_demand',
+    'rolling_3day_demand', 'rolling_7day_demand',
+    'rolling_14day_demand', 'rolling_30day_demand',
+    'rolling_7day_std', 'rolling_14day_std'))
+
+
+def _fill_ar_row(X, preds, day, s1, s2, s3):
+    """Fill X[day]'s lag/rolling cells from the prior predictions.
+
+    Returns the 7-day rolling mean (reused in the explanation string).
+    """
+    prev = preds[day - 1]
+    r7 = s1 / day
+    r3 = s3 / 3 if day >= 3 else r7
+    # population variance, matching ndarray.std() on the window
+    std = np.sqrt(max(s2 / day - r7 * r7, 0.0)) if day > 1 else 0.0
+    i = _AR_IDX
+    X[day, i[0]] = prev
+    X[day, i[1]] = prev * 0.95
+    X[day, i[2]] = 0.0
+    X[day, i[3]] = prev
+    X[day, i[4]] = r3
+    X[day, i[5]] = r7
+    X[day, i[6]] = r7
+    X[day, i[7]] = r7
+    X[day, i[8]] = std
+    X[day, i[9]] = std
+    return r7
+
+
 def predict_7_days(item_name, business_type, price, shelf_life_hours,
                    starting_date, weather_forecast, holiday_flags):
     """
     Generate a 7-day demand forecast.
     Returns a list of 7 dicts, one per day.
+
+    weather_forecast and holiday_flags are only read, never mutated,
+    so callers may pass lists without copying.
+
+    All calendar-driven columns are filled into one preallocated 7x34
+    matrix up front; the per-day loop only updates the autoregressive
+    lag/rolling entries before each model call.
     """
     start = pd.to_datetime(starting_date)
 
@@ -98,118 +212,112 @@ def predict_7_days(item_name, business_type, price, shelf_life_hours,
     category_enc = category_encoder.transform([item_features['category']])[0]
     business_enc = biz_encoder.transform([business_type])[0]
     recent = _get_recent_data(item_name, business_type)
-    predictions  = []
 
-    for day in range(7):
-        pred_date = start + timedelta(days=day)
-        dow = pred_date.dayofweek
-        month = pred_date.month
-        week_of_yr = pred_date.isocalendar()[1]
-        day_of_mth = pred_date.day
-
-        is_weekend = int(dow >= 5)
-        is_monday = int(dow == 0)
-        is_friday = int(dow == 4)
-        is_saturday = int(dow == 5)
-        is_sunday = int(dow == 6)
-
-        day_sin = np.sin(2 * np.pi * dow   / 7)
-        day_cos = np.cos(2 * np.pi * dow   / 7)
-        month_sin = np.sin(2 * np.pi * month / 12)
-        month_cos = np.cos(2 * np.pi * month / 12)
-
-        is_rainy = int(weather_forecast[day] == 'Rainy')
-        holiday_flag = holiday_flags[day]
+    dates = pd.date_range(start, periods=7)
+    dow = dates.dayofweek.to_numpy()
+    month = dates.month.to_numpy()
+    is_weekend = (dow >= 5).astype(np.int64)
+    is_friday = (dow == 4).astype(np.int64)
+    is_rainy = np.fromiter((w == 'Rainy' for w in weather_forecast[:7]), dtype=np.int64, count=7)
+    holiday = np.asarray(holiday_flags[:7], dtype=np.int64)
+    date_strs = dates.strftime('%Y-%m-%d')
+    day_names = dates.strftime('%A')
 
-        if day == 0:
-            prev_day_demand = recent['customer_demand'].iloc[-1]
-            prev_day_sold = recent['quantity_sold'].iloc[-1]
-            prev_day_waste = recent['waste_quantity'].iloc[-1]
-            prev_week_demand = recent['customer_demand'].iloc[-7] if len(recent) >= 7 else prev_day_demand
-        else:
-            prev_day_demand = predictions[day - 1]['predicted_demand']
-            prev_day_sold = prev_day_demand * 0.95
-            prev_day_waste = 0
-            prev_week_demand = predictions[day - 7]['predicted_demand'] if day >= 7 else prev_day_demand
+    X = np.empty((7, len(FEATURE_COLS)), dtype=np.float64)
+    X[:, FEAT_IDX['day_of_week']] = dow
+    X[:, FEAT_IDX['month']] = month
+    X[:, FEAT_IDX['week_of_year']] = dates.isocalendar().week.to_numpy()
+    X[:, FEAT_IDX['day_of_month']] = dates.day.to_numpy()
+    X[:, FEAT_IDX['is_weekend']] = is_weekend
+    X[:, FEAT_IDX['is_monday']] = dow == 0
+    X[:, FEAT_IDX['is_friday']] = is_friday
+    X[:, FEAT_IDX['is_saturday']] = dow == 5
+    X[:, FEAT_IDX['is_sunday']] = dow == 6
+    X[:, FEAT_IDX['day_sin']] = DOW_SIN[dow]
+    X[:, FEAT_IDX['day_cos']] = DOW_COS[dow]
+    X[:, FEAT_IDX['month_sin']] = MONTH_SIN[month]
+    X[:, FEAT_IDX['month_cos']] = MONTH_COS[month]
+    X[:, FEAT_IDX['holiday_flag']] = holiday
+    X[:, FEAT_IDX['is_rainy']] = is_rainy
+    X[:, FEAT_IDX['category_encoded']] = category_enc
+    X[:, FEAT_IDX['preparation_complexity']] = item_features['preparation_complexity']
+    X[:, FEAT_IDX['business_encoded']] = business_enc
+    X[:, FEAT_IDX['price']] = price
+    X[:, FEAT_IDX['shelf_life_hours']] = shelf_life_hours
+    X[:, FEAT_IDX['weekend_x_holiday']] = is_weekend * holiday
+    X[:, FEAT_IDX['rainy_x_weekend']] = is_rainy * is_weekend
+    X[:, FEAT_IDX['rainy_x_holiday']] = is_rainy * holiday
+    X[:, FEAT_IDX['friday_x_weekend']] = is_friday * is_weekend
+
+    # copy=False keeps this a view over X, so the per-day writes below
+    # are visible to the model without rebuilding a frame.
+    feat_df = pd.DataFrame(X, columns=FEATURE_COLS, copy=False)
+
+    # Day-0 seeds from history
+    hist_demand = recent['customer_demand']
 
+    preds = np.empty(7)
+    predictions = []
+
+    # Running moments over the previously predicted days. The horizon is
+    # 7, so the trailing window never evicts for the mean/std; only the
+    # 3-day sum drops its oldest value. One add per day replaces the
+    # slice-and-rescan over preds.
+    s1 = s2 = s3 = 0.0
+
+    for day in range(7):
         if day == 0:
-            rolling_3d = recent['customer_demand'].tail(3).mean()
-            rolling_7d = recent['customer_demand'].tail(7).mean()
-            rolling_14d = recent['customer_demand'].tail(14).mean() if len(recent) >= 14 else rolling_7d
-            rolling_30d = recent['customer_demand'].tail(30).mean() if len(recent) >= 30 else rolling_7d
-            std_7d = recent['customer_demand'].tail(7).std() or 0
-            std_14d = recent['customer_demand'].tail(14).std() if len(recent) >= 14 else std_7d
+            rolling_7d = hist_demand.tail(7).mean()
+            prev_day_demand = hist_demand.iloc[-1]
+            X[0, FEAT_IDX['prev_day_demand']] = prev_day_demand
+            X[0, FEAT_IDX['prev_day_sold']] = recent['quantity_sold'].iloc[-1]
+            X[0, FEAT_IDX['prev_day_waste']] = recent['waste_quantity'].iloc[-1]
+            X[0, FEAT_IDX['prev_week_demand']] = (hist_demand.iloc[-7]
+                                                 if len(recent) >= 7 else prev_day_demand)
+            X[0, FEAT_IDX['rolling_3day_demand']] = hist_demand.tail(3).mean()
+            X[0, FEAT_IDX['rolling_7day_demand']] = rolling_7d
+            X[0, FEAT_IDX['rolling_14day_demand']] = (hist_demand.tail(14).mean()
+                                                      if len(recent) >= 14 else rolling_7d)
+            X[0, FEAT_IDX['rolling_30day_demand']] = (hist_demand.tail(30).mean()
+                                                      if len(recent) >= 30 else rolling_7d)
+            std_7d = hist_demand.tail(7).std() or 0
+            X[0, FEAT_IDX['rolling_7day_std']] = std_7d
+            X[0, FEAT_IDX['rolling_14day_std']] = (hist_demand.tail(14).std()
+                                                   if len(recent) >= 14 else std_7d)
         else:
-            rp = [p['predicted_demand'] for p in predictions[-min(day, 7):]]
-            rolling_3d = np.mean(rp[-3:])
-            rolling_7d = np.mean(rp)
-            rolling_14d = rolling_7d
-            rolling_30d = rolling_7d
-            std_7d = np.std(rp) if len(rp) > 1 else 0
-            std_14d = std_7d
-
-        feat = pd.DataFrame([{
-            'day_of_week': dow,
-            'month': month,
-            'week_of_year': week_of_yr,
-            'day_of_month': day_of_mth,
-            'is_weekend': is_weekend,
-            'is_monday': is_monday,
-            'is_friday': is_friday,
-            'is_saturday': is_saturday,
-            'is_sunday': is_sunday,
-            'day_sin': day_sin,
-            'day_cos': day_cos,
-            'month_sin': month_sin,
-            'month_cos': month_cos,
-            'holiday_flag': holiday_flag,
-            'is_rainy': is_rainy,
-            'category_encoded': category_enc,
-            'preparation_complexity': item_features['preparation_complexity'],
-            'business_encoded': business_enc,
-            'price': price,
-            'shelf_life_hours': shelf_life_hours,
-            'prev_day_demand': prev_day_demand,
-            'prev_day_sold': prev_day_sold,
-            'prev_day_waste': prev_day_waste,
-            'prev_week_demand': prev_week_demand,
-            'rolling_3day_demand': rolling_3d,
-            'rolling_7day_demand': rolling_7d,
-            'rolling_14day_demand': rolling_14d,
-            'rolling_30day_demand': rolling_30d,
-            'rolling_7day_std': std_7d,
-            'rolling_14day_std': std_14d,
-            'weekend_x_holiday': is_weekend * holiday_flag,
-            'rainy_x_weekend': is_rainy * is_weekend,
-            'rainy_x_holiday': is_rainy * holiday_flag,
-            'friday_x_weekend': is_friday * is_weekend,
-        }])
-
-        predicted_demand = max(0, round(final_model.predict(feat)[0]))
+            rolling_7d = _fill_ar_row(X, preds, day, s1, s2, s3)
+
+        predicted_demand = max(0, round(float(_predict_one(feat_df, X, day))))
+        preds[day] = predicted_demand
+        s1 += predicted_demand
+        s2 += predicted_demand * predicted_demand
+        s3 += predicted_demand
+        if day >= 3:
+            s3 -= preds[day - 3]
         confidence_score = round(max(0.55, 0.85 - (day * 0.05)), 2)
         confidence = 'High' if confidence_score >= 0.75 else 'Medium' if confidence_score >= 0.60 else 'Low'
 
         factors = []
-        if pred_date.strftime('%A') in ('Saturday', 'Sunday') and business_type != 'Cafe':
+        if day_names[day] in ('Saturday', 'Sunday') and business_type != 'Cafe':
             factors.append('weekend uplift')
-        if pred_date.strftime('%A') in ('Saturday', 'Sunday') and business_type == 'Cafe':
+        if day_names[day] in ('Saturday', 'Sunday') and business_type == 'Cafe':
             factors.append('weekend drop')
-        if holiday_flag == 1:
+        if holiday[day] == 1:
             factors.append('holiday effect')
-        if is_rainy:
+        if is_rainy[day]:
             factors.append('rainy weather')
         factors.append(f'7-day avg ({rolling_7d:.0f})')
 
         predictions.append({
-            'date': pred_date.strftime('%Y-%m-%d'),
-            'day_name': pred_date.strftime('%A'),
+            'date': date_strs[day],
+            'day_name': day_names[day],
             'day_number': day + 1,
             'predicted_demand': int(predicted_demand),
             'recommended_quantity': int(round(predicted_demand * 1.05)),
             'confidence': confidence,
             'confidence_score': confidence_score,
             'weather': weather_forecast[day],
-            'is_holiday': 'Yes' if holiday_flag == 1 else 'No',
+            'is_holiday': 'Yes' if holiday[day] == 1 else 'No',
             'is_new_item': not is_known,
             'explanation': 'Based on: ' + ', '.join(factors[:3]),
         })
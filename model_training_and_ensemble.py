@@ -3,9 +3,12 @@
 # Creates: final_model_v3.pkl, ensemble_model_v3.pkl
 
 import os
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pandas as pd
 import joblib
+from joblib import Parallel, delayed
 import matplotlib.pyplot as plt
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.linear_model import Ridge
@@ -16,8 +19,14 @@ DATA_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # ---- LOAD -----------------------------------------
 print("Loading processed data...")
-df = pd.read_csv(os.path.join(DATA_DIR, 'processed_data_with_features_v3.csv'))
-df['date'] = pd.to_datetime(df['date'])
+_PARQUET_PATH = os.path.join(DATA_DIR, 'processed_data_with_features_v3.parquet')
+if os.path.exists(_PARQUET_PATH):
+    df = pd.read_parquet(_PARQUET_PATH, engine='pyarrow')
+else:
+    df = pd.read_csv(os.path.join(DATA_DIR, 'processed_data_with_features_v3.csv'),
+                     engine='pyarrow', parse_dates=['date'],
+                     dtype={'business_type': 'category', 'item_name': 'category',
+                            'weather_condition': 'category'})
 print(f"Shape: {df.shape}")
 
 # ----- FEATURES (34) -----------------------------------------
@@ -35,6 +44,21 @@ FEATURE_COLS = [
     'weekend_x_holiday', 'rainy_x_weekend', 'rainy_x_holiday', 'friday_x_weekend',
 ]
 
+# Narrow dtypes before slicing: the 0/1 flags fit uint8 and every
+# continuous feature fits float32, halving the bytes the tree ensembles
+# stream during fit and predict.
+FLAG_COLS = ['is_weekend', 'is_monday', 'is_friday', 'is_saturday', 'is_sunday',
+             'is_rainy', 'holiday_flag',
+             'weekend_x_holiday', 'rainy_x_weekend', 'rainy_x_holiday', 'friday_x_weekend']
+FLOAT_COLS = ['day_sin', 'day_cos', 'month_sin', 'month_cos',
+              'price', 'shelf_life_hours',
+              'prev_day_demand', 'prev_day_sold', 'prev_day_waste', 'prev_week_demand',
+              'rolling_3day_demand', 'rolling_7day_demand',
+              'rolling_14day_demand', 'rolling_30day_demand',
+              'rolling_7day_std', 'rolling_14day_std']
+df[FLAG_COLS] = df[FLAG_COLS].astype('uint8')
+df[FLOAT_COLS] = df[FLOAT_COLS].astype('float32')
+
 X = df[FEATURE_COLS]
 y = df['customer_demand']
 
@@ -61,6 +85,7 @@ models = {
     'XGBoost': XGBRegressor(
         n_estimators=200, max_depth=6, learning_rate=0.1,
         subsample=0.8, colsample_bytree=0.8,
+        tree_method='hist',
         random_state=42, n_jobs=-1, verbosity=0
     ),
 }
@@ -69,10 +94,28 @@ print("\nTraining models...")
 results = {}
 trained_models = {}
 
-for name, model in models.items():
+
+def _fit_one(name, model):
     print(f"Training {name}...")
     model.fit(X_train, y_train)
-    trained_models[name] = model
+    return name, model
+
+
+# Ridge and GradientBoosting are single-threaded learners; fit them in
+# joblib worker processes while RandomForest and XGBoost (which already
+# saturate cores with n_jobs=-1) run in the main process. Wall time is
+# the longer of the two groups instead of the sum of all four fits.
+SINGLE_THREADED = ['Ridge', 'GradientBoosting']
+with ThreadPoolExecutor(max_workers=1) as ex:
+    background = ex.submit(lambda: Parallel(n_jobs=2)(
+        delayed(_fit_one)(name, models[name]) for name in SINGLE_THREADED))
+    for name in models:
+        if name not in SINGLE_THREADED:
+            trained_models[name] = _fit_one(name, models[name])[1]
+    trained_models.update(dict(background.result()))
+
+for name in models:
+    model = trained_models[name]
     ytr = model.predict(X_train)
     yte = model.predict(X_test)
     results[name] = {
@@ -92,10 +135,14 @@ class EnsembleModel:
         self.weights = weights
 
     def predict(self, X):
-        out = np.zeros(len(X))
-        for name, model in self.models.items():
-            out += model.predict(X) * self.weights[name]
-        return out
+        # Stack the per-model predictions and fold the weighted sum into
+        # one BLAS dot — a single pass over the prediction matrix instead
+        # of n_models accumulation passes. Weights are rebuilt from the
+        # pickled dict so existing model files load unchanged.
+        names = list(self.models)
+        P = np.vstack([self.models[n].predict(X) for n in names])
+        w = np.array([self.weights[n] for n in names])
+        return w @ P
 
 
 mape_scores = {n: results[n]['test_mape'] for n in models}
@@ -121,8 +168,10 @@ else:
 print(f"\nBest model: {final_name} (MAPE: {final_mape:.2f}%)")
 
 # ---- SAVE -----------------------------------------
-joblib.dump(ensemble, os.path.join(DATA_DIR, 'ensemble_model_v3.pkl'))
-joblib.dump(final_model, os.path.join(DATA_DIR, 'final_model_v3.pkl'))
+# compress=3 (zlib) trades a little dump time for files several times
+# smaller, which also speeds the API's cold-start load from disk.
+joblib.dump(ensemble, os.path.join(DATA_DIR, 'ensemble_model_v3.pkl'), compress=3)
+joblib.dump(final_model, os.path.join(DATA_DIR, 'final_model_v3.pkl'), compress=3)
 
 # Feature importance chart
 if 'XGBoost' in trained_models:
@@ -10,24 +10,38 @@ from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error,
 
 DATA_DIR = os.path.dirname(os.path.abspath(__file__))
 
-METRICS_FILE = os.path.join(DATA_DIR, 'model_metrics.json')
+# Append-only NDJSON: one metrics dict per line, so logging a day's
+# predictions is an O(1) append instead of rewriting the whole history.
+METRICS_FILE = os.path.join(DATA_DIR, 'model_metrics.ndjson')
+LEGACY_METRICS_FILE = os.path.join(DATA_DIR, 'model_metrics.json')
 
 
 class ModelMonitor:
 
     def __init__(self):
         self.metrics_history = self._load()
+        # (mape, mae, r2) as a float32 buffer so the rolling averages
+        # below are single vectorized reductions, not list rebuilds.
+        self._scores = np.array([(m['mape'], m['mae'], m['r2'])
+                                 for m in self.metrics_history],
+                                dtype=np.float32).reshape(-1, 3)
 
     def _load(self):
-        try:
+        if os.path.exists(METRICS_FILE):
             with open(METRICS_FILE, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return []
+                return [json.loads(line) for line in f if line.strip()]
+        if os.path.exists(LEGACY_METRICS_FILE):
+            # One-time migration from the old rewrite-everything format
+            with open(LEGACY_METRICS_FILE, 'r') as f:
+                history = json.load(f)
+            with open(METRICS_FILE, 'w') as f:
+                f.writelines(json.dumps(m) + '\n' for m in history)
+            return history
+        return []
 
-    def _save(self):
-        with open(METRICS_FILE, 'w') as f:
-            json.dump(self.metrics_history, f, indent=2)
+    def _append(self, metrics):
+        with open(METRICS_FILE, 'a') as f:
+            f.write(json.dumps(metrics) + '\n')
 
     def log_predictions(self, y_true, y_pred, business_type=None, item_name=None):
         y_true = np.array(y_true)
@@ -45,24 +59,25 @@ class ModelMonitor:
         if metrics['mape'] > 25:
             print(f"🚨 MAPE {metrics['mape']:.2f}% exceeds 25% — model drift detected. Call /api/retrain.")
         self.metrics_history.append(metrics)
-        self._save()
+        self._scores = np.vstack(
+            [self._scores, [[metrics['mape'], metrics['mae'], metrics['r2']]]])
+        self._append(metrics)
         return metrics
 
     def get_recent_performance(self, n=7):
-        recent = self.metrics_history[-n:] if self.metrics_history else []
-        if not recent:
+        if not len(self._scores):
             return None
+        avg_mape, avg_mae, avg_r2 = self._scores[-n:].mean(axis=0)
         return {
-            'avg_mape': round(float(np.mean([m['mape'] for m in recent])), 2),
-            'avg_mae':  round(float(np.mean([m['mae']  for m in recent])), 2),
-            'avg_r2':   round(float(np.mean([m['r2']   for m in recent])), 3),
+            'avg_mape': round(float(avg_mape), 2),
+            'avg_mae':  round(float(avg_mae), 2),
+            'avg_r2':   round(float(avg_r2), 3),
         }
 
     def needs_retraining(self, threshold_mape=12.0, window=7):
-        if len(self.metrics_history) < window:
+        if len(self._scores) < window:
             return False
-        recent   = self.metrics_history[-window:]
-        avg_mape = float(np.mean([m['mape'] for m in recent]))
+        avg_mape = float(self._scores[-window:, 0].mean())
         if avg_mape > threshold_mape:
             print(f"⚠️  Retraining needed: avg MAPE {avg_mape:.2f}% over last {window} logs")
             return True
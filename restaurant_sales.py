@@ -1,6 +1,5 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 
 """
 RESTAURANT SALES DATASET
@@ -10,7 +9,7 @@ Simplified dataset with only required columns
 # ---------- CONFIGURATION ----------
 start_date = "2025-06-01"
 days = 180  # 6 months
-np.random.seed(42)
+rng = np.random.default_rng(42)
 
 # RESTAURANT ITEMS
 items = {
@@ -44,78 +43,70 @@ monthly_multipliers = {
 
 # ----------------------------------
 
-date_range = pd.date_range(start=start_date, periods=days)
-data = []
-
-for idx, date in enumerate(date_range):
-    day_of_week = date.weekday()
-    month = date.month
-    
-    # Weekend effect
-    is_weekend = day_of_week >= 5
-    weekend_effect = weekend_multiplier if is_weekend else 1.0
-    
-    # Monthly effect
-    monthly_effect = monthly_multipliers.get(month, 1.0)
-    
-    # Trend
-    trend_effect = 1 + (0.001 * idx)
-    
-    # Random external factors
-    is_holiday = np.random.rand() < holiday_probability
-    is_rainy = np.random.rand() < rainy_probability
-    
-    holiday_flag = 1 if is_holiday else 0
-    weather_condition = "Rainy" if is_rainy else "Clear"
-    
-    weather_effect = rainy_multiplier if is_rainy else 1.0
-    holiday_effect = holiday_multiplier if is_holiday else 1.0
-    
-    # Generate data for each item
-    for item_name, item_info in items.items():
-        base_demand = base_demands[item_name]
-        price = item_info["price"]
-        shelf_life_hours = item_info["shelf_life_hours"]
-        
-        # Calculate expected demand
-        expected_demand = (base_demand * 
-                          weekend_effect * 
-                          monthly_effect * 
-                          trend_effect * 
-                          weather_effect * 
-                          holiday_effect)
-        
-        # Planned production (with buffer)
-        planned_quantity = expected_demand * 1.05
-        quantity_available = planned_quantity * (1 + np.random.uniform(-0.1, 0.1))
-        quantity_available = max(0, round(quantity_available))
-        
-        # Customer demand (actual)
-        customer_demand = expected_demand * (1 + np.random.uniform(-0.15, 0.15))
-        customer_demand = max(0, round(customer_demand))
-        
-        # Actual sales
-        quantity_sold = min(customer_demand, quantity_available)
-        
-        # Waste
-        waste_quantity = max(0, quantity_available - quantity_sold)
-        
-        data.append({
-            "business_type": "Restaurant",
-            "item_name": item_name,
-            "date": date.strftime("%Y-%m-%d"),
-            "price": price,
-            "shelf_life_hours": shelf_life_hours,
-            "quantity_available": quantity_available,
-            "quantity_sold": quantity_sold,
-            "customer_demand": customer_demand,
-            "waste_quantity": waste_quantity,
-            "weather_condition": weather_condition,
-            "holiday_flag": holiday_flag
-        })
-
-# Create DataFrame
-df = pd.DataFrame(data)
+# All 180 x 5 rows are generated with array arithmetic — no Python loop
+# over days or items, and every random draw is batched.
+dates = np.arange(np.datetime64(start_date), np.datetime64(start_date) + np.timedelta64(days, "D"))
+# datetime64[D] stringifies as ISO "YYYY-MM-DD" — one cast instead of
+# one strftime call per row.
+date_strs = dates.astype(str)
+day_of_week = (dates.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+
+# Month -> multiplier as a length-13 lookup array (index 0 unused)
+month = dates.astype("datetime64[M]").astype(np.int64) % 12 + 1
+monthly_lut = np.ones(13)
+for m, v in monthly_multipliers.items():
+    monthly_lut[m] = v
+
+# Weekend effect
+weekend_effect = np.where(day_of_week >= 5, weekend_multiplier, 1.0)
+
+# Trend
+trend_effect = 1 + (0.001 * np.arange(days))
+
+# Random external factors (one draw per day, batched)
+is_holiday = rng.random(days) < holiday_probability
+is_rainy = rng.random(days) < rainy_probability
+
+holiday_flag = is_holiday.astype(np.uint8)
+weather_condition = np.where(is_rainy, "Rainy", "Clear")
+
+day_effect = (weekend_effect *
+              monthly_lut[month] *
+              trend_effect *
+              np.where(is_rainy, rainy_multiplier, 1.0) *
+              np.where(is_holiday, holiday_multiplier, 1.0))
+
+item_names = list(items)
+n_items = len(item_names)
+base = np.array([base_demands[name] for name in item_names], dtype=float)
+prices = np.array([items[name]["price"] for name in item_names], dtype=float)
+shelf_lives = np.array([items[name]["shelf_life_hours"] for name in item_names], dtype=float)
+
+# Broadcast to a (days, n_items) grid, with all noise drawn in one call
+expected_demand = day_effect[:, None] * base[None, :]
+avail_noise = rng.uniform(-0.1, 0.1, (days, n_items))
+demand_noise = rng.uniform(-0.15, 0.15, (days, n_items))
+
+# Planned production (with buffer), actual demand, sales and waste
+quantity_available = np.maximum(0, np.round(expected_demand * 1.05 * (1 + avail_noise)))
+customer_demand = np.maximum(0, np.round(expected_demand * (1 + demand_noise)))
+quantity_sold = np.minimum(customer_demand, quantity_available)
+waste_quantity = np.maximum(0, quantity_available - quantity_sold)
+
+# Create DataFrame from columnar arrays
+df = pd.DataFrame({
+    "business_type": np.repeat("Restaurant", days * n_items),
+    "item_name": np.tile(item_names, days),
+    "date": np.repeat(date_strs, n_items),
+    "price": np.tile(prices, days),
+    "shelf_life_hours": np.tile(shelf_lives, days),
+    "quantity_available": quantity_available.ravel().astype(np.int32),
+    "quantity_sold": quantity_sold.ravel().astype(np.int32),
+    "customer_demand": customer_demand.ravel().astype(np.int32),
+    "waste_quantity": waste_quantity.ravel().astype(np.int32),
+    "weather_condition": np.repeat(weather_condition, n_items),
+    "holiday_flag": np.repeat(holiday_flag, n_items),
+})
 
 # Save to CSV
 output_file = "restaurant_sales_dataset.csv"
@@ -155,11 +146,15 @@ for col in required_cols:
 print("\n" + "="*80)
 print("BUSINESS INSIGHTS")
 print("="*80)
-total_revenue = (df['quantity_sold'] * df['price']).sum()
-total_waste = df['waste_quantity'].sum()
-waste_value = sum(df['waste_quantity'] * df['price'])
-
-print(f"Total items sold: {df['quantity_sold'].sum():,}")
+# Money figures as BLAS dot products — no temporary product columns
+qs = df['quantity_sold'].to_numpy()
+wq = df['waste_quantity'].to_numpy()
+pr = df['price'].to_numpy()
+total_revenue = float(qs @ pr)
+total_waste = int(wq.sum())
+waste_value = float(wq @ pr)
+
+print(f"Total items sold: {int(qs.sum()):,}")
 print(f"Total revenue: ${total_revenue:,.2f}")
 print(f"Total waste quantity: {total_waste:,} items")
 print(f"Total waste value: ${waste_value:,.2f}")
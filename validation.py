@@ -2,6 +2,7 @@
 # Validates user-uploaded CSVs before retraining.
 # Imported by retrain.py — no need to run this directly.
 
+import numpy as np
 import pandas as pd
 
 
@@ -21,22 +22,28 @@ def validate_csv_upload(df: pd.DataFrame) -> dict:
         except (ValueError, TypeError):
             errors.append("Date column has invalid format — use YYYY-MM-DD")
 
-    # Negative quantity_sold
+    # Quantity checks — the columns come out as ndarrays once, so the
+    # negative and oversell scans share a single materialization instead
+    # of building two intermediate boolean Series.
     if 'quantity_sold' in df.columns:
-        n = (df['quantity_sold'] < 0).sum()
+        qs = df['quantity_sold'].to_numpy()
+        n = int(np.count_nonzero(qs < 0))
         if n > 0:
             errors.append(f"Found {n} negative quantity_sold value(s)")
 
-    # Business logic
-    if all(c in df.columns for c in ['quantity_sold', 'quantity_available']):
-        v = (df['quantity_sold'] > df['quantity_available']).sum()
-        if v > 0:
-            errors.append(f"{v} row(s) have quantity_sold > quantity_available")
-
-    # Missing values (warning only)
-    null_counts = df.isnull().sum()
-    if null_counts.sum() > 0:
-        warnings.append(f"Missing values: {dict(null_counts[null_counts > 0])}")
+        # Business logic
+        if 'quantity_available' in df.columns:
+            v = int(np.count_nonzero(qs > df['quantity_available'].to_numpy()))
+            if v > 0:
+                errors.append(f"{v} row(s) have quantity_sold > quantity_available")
+
+    # Missing values (warning only) — count per column only where any()
+    # found nulls, so a clean upload stops after one reduction
+    any_null  = df.isna().any()
+    null_cols = any_null.index[any_null]
+    if len(null_cols):
+        null_counts = df[null_cols].isna().sum()
+        warnings.append(f"Missing values: {dict(null_counts)}")
 
     return {
         'valid':    len(errors) == 0,